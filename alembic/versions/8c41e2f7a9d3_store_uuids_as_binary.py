@@ -0,0 +1,75 @@
+"""Store UUID keys as BINARY(16)
+
+Revision ID: 8c41e2f7a9d3
+Revises: 3d3bb0cee6c3
+Create Date: 2026-10-15 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c41e2f7a9d3'
+down_revision: Union[str, None] = '3d3bb0cee6c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Key columns to convert; referenced keys come before the foreign keys
+# pointing at them.
+UUID_COLUMNS = [
+    ('users', 'id'),
+    ('inboxes', 'id'),
+    ('inboxes', 'user_id'),
+    ('messages', 'id'),
+    ('messages', 'inbox_id'),
+]
+
+
+def _drop_foreign_keys() -> None:
+    # Names are the ones MySQL generates for the unnamed constraints.
+    op.drop_constraint('messages_ibfk_1', 'messages', type_='foreignkey')
+    op.drop_constraint('inboxes_ibfk_1', 'inboxes', type_='foreignkey')
+
+
+def _create_foreign_keys() -> None:
+    op.create_foreign_key(
+        'inboxes_ibfk_1', 'inboxes', 'users', ['user_id'], ['id']
+    )
+    op.create_foreign_key(
+        'messages_ibfk_1', 'messages', 'inboxes', ['inbox_id'], ['id']
+    )
+
+
+def upgrade() -> None:
+    _drop_foreign_keys()
+    for table, column in UUID_COLUMNS:
+        # Go through VARBINARY so the text form can be rewritten in place.
+        op.alter_column(table, column,
+                   existing_type=mysql.VARCHAR(length=36),
+                   type_=mysql.VARBINARY(length=36),
+                   existing_nullable=False)
+        op.execute(f'UPDATE {table} SET {column} = UUID_TO_BIN({column})')
+        op.alter_column(table, column,
+                   existing_type=mysql.VARBINARY(length=36),
+                   type_=sa.BINARY(length=16),
+                   existing_nullable=False)
+    _create_foreign_keys()
+
+
+def downgrade() -> None:
+    _drop_foreign_keys()
+    for table, column in UUID_COLUMNS:
+        op.alter_column(table, column,
+                   existing_type=sa.BINARY(length=16),
+                   type_=mysql.VARBINARY(length=36),
+                   existing_nullable=False)
+        op.execute(f'UPDATE {table} SET {column} = BIN_TO_UUID({column})')
+        op.alter_column(table, column,
+                   existing_type=mysql.VARBINARY(length=36),
+                   type_=mysql.VARCHAR(length=36),
+                   existing_nullable=False)
+    _create_foreign_keys()
@@ -0,0 +1,28 @@
+"""Unique inbox name per user
+
+Revision ID: b5e07d2c61f4
+Revises: 8c41e2f7a9d3
+Create Date: 2026-10-15 09:45:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e07d2c61f4'
+down_revision: Union[str, None] = '8c41e2f7a9d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_unique_constraint(
+        'uq_inboxes_user_id_name', 'inboxes', ['user_id', 'name']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_inboxes_user_id_name', 'inboxes', type_='unique')
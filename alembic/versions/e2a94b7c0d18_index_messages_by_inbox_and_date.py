@@ -0,0 +1,31 @@
+"""Index messages by inbox and creation date
+
+Revision ID: e2a94b7c0d18
+Revises: b5e07d2c61f4
+Create Date: 2026-10-15 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a94b7c0d18'
+down_revision: Union[str, None] = 'b5e07d2c61f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_messages_inbox_id_created_at',
+        'messages',
+        ['inbox_id', 'created_at'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_messages_inbox_id_created_at', table_name='messages')
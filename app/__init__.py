@@ -1,12 +1,60 @@
 #!/usr/bin/env python3
+import os
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+import orjson
+from cachetools import TTLCache
+from flask.json.provider import JSONProvider
 from flask_login import LoginManager
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
+from sqlalchemy import event
+from sqlalchemy.orm import raiseload
 
 db = SQLAlchemy()
 bcrypt = Bcrypt()
 login_manager = LoginManager()
 
+# bcrypt releases the GIL while hashing, so running it on a shared pool lets
+# concurrent logins/sign-ups use every core instead of queueing per worker.
+hash_executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+
+# Recently rejected (email, sha256(password)) pairs, so bursts of identical
+# failed logins are answered without paying for another bcrypt verify. Only
+# failures are cached; User.set_password evicts the entries for that user's
+# email. The cache is per process, so other Gunicorn workers can keep a stale
+# rejection until it expires (at most 30 seconds).
+failed_logins = TTLCache(maxsize=1024, ttl=30)
+failed_logins_lock = Lock()
+
+# Users resolved by load_user, keyed by ID. Entries are detached from their
+# session so they can be shared across requests; update_user and
+# delete_user evict them.
+user_cache = TTLCache(maxsize=1024, ttl=60)
+user_cache_lock = Lock()
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    JSON provider backed by orjson, which serializes datetimes and UUIDs
+    natively and writes response bodies straight to bytes.
+    """
+
+    option = orjson.OPT_NAIVE_UTC
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=self.option).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, option=self.option), mimetype="application/json"
+        )
+
 
 def create_app():
     from config import Config
@@ -14,25 +62,71 @@ def create_app():
 
     app = Flask(__name__)
     app.config.from_object(Config)
+    app.json = OrjsonProvider(app)
 
     db.init_app(app)
     bcrypt.init_app(app)
     login_manager.init_app(app)
 
+    if app.debug:
+        # Turn accidental lazy loads into errors while developing
+        event.listen(db.session, "do_orm_execute", raise_on_lazy_load)
+
     from app.routes import api
 
     # Register the API blueprint with the app disabling strict slashes
     app.register_blueprint(api, url_prefix="/api")
 
-    with app.app_context():
-        db.metadata.create_all(db.engine)
+    # Schema changes go through Alembic; create_all is only for new databases
+    if app.config["INIT_DB"]:
+        with app.app_context():
+            db.metadata.create_all(db.engine)
 
     app.url_map.strict_slashes = False
     return app
 
 
+def raise_on_lazy_load(orm_execute_state):
+    """
+    Add raiseload("*") to top-level ORM selects so that any relationship
+    not loaded up front raises instead of issuing a hidden query.
+    """
+    if (
+        orm_execute_state.is_select
+        and not orm_execute_state.is_column_load
+        and not orm_execute_state.is_relationship_load
+    ):
+        orm_execute_state.statement = orm_execute_state.statement.options(
+            raiseload("*")
+        )
+
+
+def evict_user(user_id):
+    """
+    Drop a user from the load_user cache after it changes.
+    """
+    with user_cache_lock:
+        user_cache.pop(str(user_id), None)
+
+
 @login_manager.user_loader
 def load_user(user_id):
     from app.models import User
 
-    return User.query.get(user_id)
+    with user_cache_lock:
+        user = user_cache.get(user_id)
+    if user is None:
+        user = User.query.get(user_id)
+        if user is None:
+            return None
+        db.session.expunge(user)
+        with user_cache_lock:
+            user_cache[user_id] = user
+    return user
+
+
+@login_manager.unauthorized_handler
+def unauthorized():
+    from flask import jsonify
+
+    return jsonify({"message": "Unauthorized"}), 401
@@ -5,8 +5,38 @@ This module defines the Base class and all models in the system.
 import uuid
 
 import bcrypt
-from app import db
+from app import db, failed_logins, failed_logins_lock, hash_executor
+from flask import current_app
 from flask_login import UserMixin
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import BINARY, TypeDecorator
+
+
+class UUID(TypeDecorator):
+    """
+    UUID column stored as a native UUID on PostgreSQL and as BINARY(16)
+    elsewhere, accepting either uuid.UUID or its string form.
+    """
+
+    impl = BINARY(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=True))
+        return dialect.type_descriptor(BINARY(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, uuid.UUID):
+            value = uuid.UUID(str(value))
+        return value if dialect.name == "postgresql" else value.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, uuid.UUID):
+            return value
+        return uuid.UUID(bytes=value)
 
 
 class Base(db.Model):
@@ -15,13 +45,11 @@ class Base(db.Model):
     """
 
     __abstract__ = True
-    id = db.Column(
-        db.String(36), primary_key=True, default=lambda: str(uuid.uuid4())
-    )
+    id = db.Column(UUID, primary_key=True, default=uuid.uuid4)
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
 
 
-class User(Base):
+class User(UserMixin, Base):
     """
     User model.
     """
@@ -42,14 +70,26 @@ class User(Base):
     )
 
     def set_password(self, password):
-        self.password = bcrypt.hashpw(
-            password.encode("utf-8"), bcrypt.gensalt()
-        ).decode("utf-8")
+        rounds = current_app.config["BCRYPT_LOG_ROUNDS"]
+        self.password = (
+            hash_executor.submit(
+                bcrypt.hashpw,
+                password.encode("utf-8"),
+                bcrypt.gensalt(rounds=rounds),
+            )
+            .result()
+            .decode("utf-8")
+        )
+        with failed_logins_lock:
+            for attempt in [a for a in failed_logins if a[0] == self.email]:
+                failed_logins.pop(attempt, None)
 
     def check_password(self, password):
-        return bcrypt.checkpw(
-            password.encode("utf-8"), self.password.encode("utf-8")
-        )
+        return hash_executor.submit(
+            bcrypt.checkpw,
+            password.encode("utf-8"),
+            self.password.encode("utf-8"),
+        ).result()
 
     def __repr__(self):
         return f"<User {self.username}>"
@@ -71,7 +111,7 @@ class User(Base):
             self.set_password(data["password"])
 
     def get_id(self):
-        return self.id
+        return str(self.id)
 
 
 class Inbox(Base):
@@ -80,10 +120,11 @@ class Inbox(Base):
     """
 
     __tablename__ = "inboxes"
-    name = db.Column(db.String(64), nullable=False, default="")
-    user_id = db.Column(
-        db.String(36), db.ForeignKey("users.id"), nullable=False
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "name", name="uq_inboxes_user_id_name"),
     )
+    name = db.Column(db.String(64), nullable=False, default="")
+    user_id = db.Column(UUID, db.ForeignKey("users.id"), nullable=False)
     updated_at = db.Column(
         db.DateTime,
         default=db.func.current_timestamp(),
@@ -91,7 +132,10 @@ class Inbox(Base):
         nullable=False,
     )
     messages = db.relationship(
-        "Message", backref="inbox", cascade="all, delete-orphan"
+        "Message",
+        backref="inbox",
+        cascade="all, delete-orphan",
+        order_by="Message.created_at",
     )
 
     def __repr__(self):
@@ -118,10 +162,11 @@ class Message(Base):
     """
 
     __tablename__ = "messages"
-    body = db.Column(db.Text, nullable=False)
-    inbox_id = db.Column(
-        db.String(36), db.ForeignKey("inboxes.id"), nullable=False
+    __table_args__ = (
+        db.Index("ix_messages_inbox_id_created_at", "inbox_id", "created_at"),
     )
+    body = db.Column(db.Text, nullable=False)
+    inbox_id = db.Column(UUID, db.ForeignKey("inboxes.id"), nullable=False)
 
     def __repr__(self):
         return f"<Message {self.id}>"
@@ -16,32 +16,89 @@ Routes:
     - /inboxes/<inbox_id>/ (DELETE): Delete an inbox by its ID.
     - /inboxes/<inbox_id>/messages/ (GET): Retrieve messages from an inbox.
     - /inboxes/<inbox_id>/messages/ (POST): Create a new message in an inbox.
+    - /inboxes/<inbox_id>/messages/bulk/ (POST): Create several messages in an inbox.
     - /register/ (GET, POST): Register a new user.
     - /login/ (POST): Log in a user.
     - /logout/ (GET): Log out a user.
     - /account/ (GET): Retrieve the account information of the currently logged-in user.
 """
+import hashlib
+import uuid
 from datetime import timedelta
-from flask import Blueprint, jsonify, request
+import orjson
+from flask import (
+    Blueprint,
+    Response,
+    jsonify,
+    request,
+    stream_with_context,
+)
 from flask_login import login_user, current_user, logout_user, login_required
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
 from app.models import User, Inbox, Message
-from app import db, bcrypt
+from app.schemas import (
+    InboxIn,
+    Login,
+    MessageBatch,
+    MessageCreate,
+    UserCreate,
+    UserUpdate,
+)
+from app import (
+    OrjsonProvider,
+    db,
+    evict_user,
+    failed_logins,
+    failed_logins_lock,
+)
 
 api = Blueprint("api", __name__)
 
+
+def validation_error(e):
+    """
+    Build a 400 response describing why a request payload was rejected.
+
+    Args:
+        e (ValidationError): The error raised while validating the payload.
+
+    Returns:
+        tuple: A JSON response with the validation errors and status 400.
+    """
+    errors = e.errors(
+        include_url=False, include_context=False, include_input=False
+    )
+    return jsonify({"message": "Invalid request", "errors": errors}), 400
+
+
+def email_exists(email):
+    """
+    Check whether a user with the given email exists, without loading it.
+
+    Args:
+        email (str): The email address to look up.
+
+    Returns:
+        bool: True if the email is already registered.
+    """
+    return db.session.query(User.id).filter_by(email=email).first() is not None
+
+
 # @api.route("/users", methods=["GET"])
 # def get_users():
 #     users = User.query.all()
 #     return jsonify([user.to_dict() for user in users])
 
 
-@api.route("/users/<string:user_id>", methods=["GET"])
+@api.route("/users/<uuid:user_id>", methods=["GET"])
 def get_user(user_id):
     """
     Retrieve a user by their ID.
 
     Args:
-        user_id (str): The ID of the user to retrieve.
+        user_id (UUID): The ID of the user to retrieve.
 
     Returns:
         dict: A dictionary representing the user's information.
@@ -69,14 +126,11 @@ def create_user():
     Returns:
         A JSON response containing the newly created user data and a status code of 201.
     """
-    data = request.get_json()
-    if "username" not in data or not data["username"]:
-        return jsonify({"message": "Username is required"}), 400
-    if "email" not in data or not data["email"]:
-        return jsonify({"message": "Email is required"}), 400
-    if "password" not in data or not data["password"]:
-        return jsonify({"message": "Password is required"}), 400
-    if User.query.filter_by(email=data["email"]).first():
+    try:
+        data = UserCreate.model_validate(request.get_json()).model_dump()
+    except ValidationError as e:
+        return validation_error(e)
+    if email_exists(data["email"]):
         return jsonify({"message": "Email already exists"}), 400
     user = User()
     try:
@@ -89,48 +143,45 @@ def create_user():
     return jsonify(user.to_dict()), 201
 
 
-@api.route("/users/<string:user_id>", methods=["PUT"])
+@api.route("/users/<uuid:user_id>", methods=["PUT"])
 def update_user(user_id):
     """
     Update a user with the given user_id.
 
     Args:
-        user_id (str): The ID of the user to update.
+        user_id (UUID): The ID of the user to update.
 
     Returns:
         dict: A JSON response containing the updated user information.
     """
-    data = request.get_json()
-    # if "username" not in data or not data["username"]:
-    #     return jsonify({"message": "Username is required"}), 400
-    # if "email" not in data or not data["email"]:
-    #     return jsonify({"message": "Email is required"}), 400
-    # if "password" not in data or not data["password"]:
-    #     return jsonify({"message": "Password is required"}), 400
+    try:
+        data = UserUpdate.model_validate(request.get_json()).model_dump(
+            exclude_none=True
+        )
+    except ValidationError as e:
+        return validation_error(e)
     try:
         user = User.query.filter_by(id=user_id).first()
         if not user:
             return jsonify({"message": "User not found"}), 404
-        if (
-            "email" in data
-            and User.query.filter_by(email=data["email"]).first()
-        ):
+        if "email" in data and email_exists(data["email"]):
             return jsonify({"message": "Email already exists"}), 400
         user.from_dict(data)
         db.session.commit()
+        evict_user(user_id)
         return jsonify(user.to_dict())
     except Exception as e:
         db.session.rollback()
         return jsonify({"message": str(e)}), 500
 
 
-@api.route("/users/<string:user_id>", methods=["DELETE"])
+@api.route("/users/<uuid:user_id>", methods=["DELETE"])
 def delete_user(user_id):
     """
     Delete a user from the database.
 
     Args:
-        user_id (str): The ID of the user to be deleted.
+        user_id (UUID): The ID of the user to be deleted.
 
     Returns:
         str: An empty string indicating a successful deletion.
@@ -141,76 +192,81 @@ def delete_user(user_id):
             return jsonify({"message": "User not found"}), 404
         db.session.delete(user)
         db.session.commit()
+        evict_user(user_id)
         return "", 204
     except Exception as e:
         db.session.rollback()
         return jsonify({"message": str(e)}), 500
 
 
-@api.route("/users/<string:user_id>/inboxes", methods=["GET"])
+@api.route("/users/<uuid:user_id>/inboxes", methods=["GET"])
 def get_inboxes(user_id):
     """
     Retrieve the inboxes for a specific user.
 
     Args:
-        user_id (str): The ID of the user.
+        user_id (UUID): The ID of the user.
 
     Returns:
         dict: A JSON response containing the inboxes for the user.
     """
     try:
-        user = User.query.get(user_id)
-        return jsonify([inbox.to_dict() for inbox in user.inboxes])
+        if not db.session.query(User.id).filter_by(id=user_id).first():
+            return jsonify({"message": "User not found"}), 404
+        # Plain rows carrying Inbox.to_dict's fields; no ORM objects needed
+        inboxes = db.session.execute(
+            select(
+                Inbox.id,
+                Inbox.name,
+                Inbox.user_id,
+                Inbox.created_at,
+                Inbox.updated_at,
+            ).where(Inbox.user_id == user_id)
+        )
+        return jsonify([inbox._asdict() for inbox in inboxes])
     except Exception as e:
         return jsonify({"message": str(e)}), 400
 
 
-@api.route("/users/<string:user_id>/inboxes", methods=["POST"])
+@api.route("/users/<uuid:user_id>/inboxes", methods=["POST"])
 def create_inbox(user_id):
     """
     Create a new inbox for a user.
 
     Args:
-        user_id (str): The ID of the user.
+        user_id (UUID): The ID of the user.
 
     Returns:
         dict: A JSON response containing the created inbox details.
     """
-    from dotenv import load_dotenv
-    from os import getenv
-
-    load_dotenv()
-    base_url = getenv("BASE_URL")
-    data = request.get_json()
-    if not data["name"]:
-        return jsonify({"message": "Name is required"}), 400
     try:
-        user = User.query.get(user_id)
-        if not user:
+        data = InboxIn.model_validate(request.get_json()).model_dump()
+    except ValidationError as e:
+        return validation_error(e)
+    try:
+        if not db.session.query(User.id).filter_by(id=user_id).first():
             return jsonify({"message": "User not found"}), 404
-        if data["name"] in [inbox.name for inbox in user.inboxes]:
-            return jsonify({"message": "Inbox already exists"}), 400
         inbox = Inbox()
-        inbox.user_id = user.id
-        data["user_id"] = user.id
-        user.inboxes.append(inbox)
-        db.session.add(inbox)
-        db.session.commit()
+        data["user_id"] = user_id
         inbox.from_dict(data)
+        db.session.add(inbox)
         db.session.commit()
         return jsonify(inbox.to_dict()), 201
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"message": "Inbox already exists"}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({"message": str(e)}), 500
 
 
-@api.route("/inboxes/<string:inbox_id>", methods=["GET"])
+@api.route("/inboxes/<uuid:inbox_id>", methods=["GET"])
 def get_inbox(inbox_id):
     """
     Retrieve an inbox by its ID.
 
     Args:
-        inbox_id (str): The ID of the inbox to retrieve.
+        inbox_id (UUID): The ID of the inbox to retrieve.
 
     Returns:
         dict: A dictionary representation of the inbox.
@@ -227,13 +283,14 @@ def get_inbox(inbox_id):
         return jsonify({"message": str(e)}), 400
 
 
-@api.route("/inboxes/<string:inbox_id>", methods=["PUT"])
+@api.route("/inboxes/<uuid:inbox_id>", methods=["PUT"])
+@login_required
 def update_inbox(inbox_id):
     """
     Update an inbox with the given inbox_id.
 
     Args:
-        inbox_id (str): The ID of the inbox to update.
+        inbox_id (UUID): The ID of the inbox to update.
 
     Returns:
         dict: A JSON response containing the updated inbox details.
@@ -242,33 +299,36 @@ def update_inbox(inbox_id):
         HTTPException: If the user is not authorized to update the inbox.
 
     """
-    user_id = request.headers.get("User-Id")
-    data = request.get_json()
-    if "name" not in data or not data["name"]:
-        return jsonify({"message": "Name is required"}), 400
     try:
-        inbox = Inbox.query.get(inbox_id)
+        data = InboxIn.model_validate(request.get_json()).model_dump()
+    except ValidationError as e:
+        return validation_error(e)
+    try:
+        # Only the owner's inbox matches, so one lookup covers both checks
+        inbox = Inbox.query.filter_by(
+            id=inbox_id, user_id=current_user.id
+        ).first()
         if not inbox:
             return jsonify({"message": "Inbox not found"}), 404
-        if inbox.user_id != user_id:
-            return jsonify({"message": "Unauthorized"}), 401
-        if "url" in data:
-            del data["url"]
         inbox.from_dict(data)
         db.session.commit()
         return jsonify(inbox.to_dict())
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"message": "Inbox already exists"}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({"message": str(e)}), 500
 
 
-@api.route("/inboxes/<string:inbox_id>", methods=["DELETE"])
+@api.route("/inboxes/<uuid:inbox_id>", methods=["DELETE"])
+@login_required
 def delete_inbox(inbox_id):
     """
     Delete an inbox.
 
     Args:
-        inbox_id (str): The ID of the inbox to be deleted.
+        inbox_id (UUID): The ID of the inbox to be deleted.
 
     Returns:
         tuple: A tuple containing an empty string and the HTTP status code 204.
@@ -276,13 +336,13 @@ def delete_inbox(inbox_id):
     Raises:
         None
     """
-    user_id = request.headers.get("User-Id")
     try:
-        inbox = Inbox.query.get(inbox_id)
+        # Only the owner's inbox matches, so one lookup covers both checks
+        inbox = Inbox.query.filter_by(
+            id=inbox_id, user_id=current_user.id
+        ).first()
         if not inbox:
             return jsonify({"message": "Inbox not found"}), 404
-        if inbox.user_id != user_id:
-            return jsonify({"message": "Unauthorized"}), 401
         db.session.delete(inbox)
         db.session.commit()
         return "", 204
@@ -291,48 +351,78 @@ def delete_inbox(inbox_id):
         return jsonify({"message": str(e)}), 500
 
 
-@api.route("/inboxes/<string:inbox_id>/messages", methods=["GET"])
+@api.route("/inboxes/<uuid:inbox_id>/messages", methods=["GET"])
+@login_required
 def get_messages(inbox_id):
     """
     Retrieve messages from an inbox.
 
     Args:
-        inbox_id (str): The ID of the inbox.
+        inbox_id (UUID): The ID of the inbox.
 
     Returns:
-        Flask Response: A JSON response containing the messages in the inbox.
+        Flask Response: A JSON array of the messages in the inbox, streamed
+        in batches of 500 rows.
 
     Raises:
         Unauthorized: If the user is not authorized to access the inbox.
     """
-    user_id = request.headers.get("User-Id")
-    inbox = Inbox.query.get(inbox_id)
-    if not inbox:
+    owned = (
+        db.session.query(Inbox.id)
+        .filter_by(id=inbox_id, user_id=current_user.id)
+        .first()
+    )
+    if not owned:
         return jsonify({"message": "Inbox not found"}), 404
-    if inbox.user_id != user_id:
-        return jsonify({"message": "Unauthorized"}), 401
-    return jsonify([message.to_dict() for message in inbox.messages])
-
 
-@api.route("/inboxes/<string:inbox_id>/messages", methods=["POST"])
+    def generate():
+        # Plain rows carrying Message.to_dict's fields; no ORM objects needed
+        messages = db.session.execute(
+            select(
+                Message.id, Message.body, Message.inbox_id, Message.created_at
+            )
+            .where(Message.inbox_id == inbox_id)
+            .order_by(Message.created_at)
+            .execution_options(yield_per=500)
+        )
+        # One chunk per 500-row partition rather than per row
+        yield b"["
+        separator = b""
+        for partition in messages.partitions():
+            yield separator + b",".join(
+                orjson.dumps(message._asdict(), option=OrjsonProvider.option)
+                for message in partition
+            )
+            separator = b","
+        yield b"]"
+
+    return Response(
+        stream_with_context(generate()), mimetype="application/json"
+    )
+
+
+@api.route("/inboxes/<uuid:inbox_id>/messages", methods=["POST"])
 def create_message(inbox_id):
     """
     Create a new message in the specified inbox.
 
     Args:
-        inbox_id (str): The ID of the inbox to create the message in.
+        inbox_id (UUID): The ID of the inbox to create the message in.
 
     Returns:
         dict: A JSON representation of the created message.
     """
     try:
-        data = request.get_json()
+        data = MessageCreate.model_validate(request.get_json()).model_dump()
+    except ValidationError as e:
+        return validation_error(e)
+    try:
         inbox = Inbox.query.get(inbox_id)
         if not inbox:
             return jsonify({"message": "Inbox not found"}), 404
         message = Message()
         message.from_dict(data)
-        inbox.messages.append(message)
+        message.inbox_id = inbox.id
         db.session.add(message)
         db.session.commit()
         return jsonify(message.to_dict()), 201
@@ -341,6 +431,36 @@ def create_message(inbox_id):
         return jsonify({"message": str(e)}), 500
 
 
+@api.route("/inboxes/<uuid:inbox_id>/messages/bulk", methods=["POST"])
+def create_messages(inbox_id):
+    """
+    Create several messages in the specified inbox with a single INSERT.
+
+    Args:
+        inbox_id (UUID): The ID of the inbox to create the messages in.
+
+    Returns:
+        dict: A JSON object listing the IDs of the created messages.
+    """
+    try:
+        batch = MessageBatch.model_validate(request.get_json())
+    except ValidationError as e:
+        return validation_error(e)
+    try:
+        if not db.session.query(Inbox.id).filter_by(id=inbox_id).first():
+            return jsonify({"message": "Inbox not found"}), 404
+        rows = [
+            {"id": uuid.uuid4(), "body": message.body, "inbox_id": inbox_id}
+            for message in batch.root
+        ]
+        db.session.execute(insert(Message), rows)
+        db.session.commit()
+        return jsonify({"ids": [row["id"] for row in rows]}), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"message": str(e)}), 500
+
+
 # Authentication routes
 @api.route("/register", methods=["GET", "POST"])
 def register():
@@ -359,18 +479,16 @@ def register():
     if current_user.is_authenticated:
         return jsonify({"message": "Already logged in"}), 400
     if request.method == "POST":
-        # validate form data
-        if not request.form.get("email"):
-            return jsonify({"message": "Email is required"}), 400
-        if not request.form.get("password"):
-            return jsonify({"message": "Password is required"}), 400
-        if not request.form.get("username"):
-            return jsonify({"message": "Username is required"}), 400
-        if User.query.filter_by(email=request.form.get("email")).first():
+        try:
+            data = UserCreate.model_validate(request.form.to_dict())
+            data = data.model_dump()
+        except ValidationError as e:
+            return validation_error(e)
+        if email_exists(data["email"]):
             return jsonify({"message": "Email already exists"}), 400
         try:
             user = User()
-            user.from_dict(request.form)
+            user.from_dict(data)
             db.session.add(user)
             db.session.commit()
             return jsonify(user.to_dict()), 201
@@ -390,15 +508,21 @@ def login():
         A JSON response containing the user's information if the login is successful,
         or an error message if the login fails.
     """
-    if not request.form.get("email"):
-        return jsonify({"message": "Email is required"}), 400
-    if not request.form.get("password"):
-        return jsonify({"message": "Password is required"}), 400
     try:
-        user = User.query.filter_by(email=request.form.get("email")).first()
-        if not user or not bcrypt.check_password_hash(
-            user.password, request.form.get("password")
-        ):
+        credentials = Login.model_validate(request.form.to_dict())
+    except ValidationError as e:
+        return validation_error(e)
+    email = credentials.email
+    password = credentials.password.get_secret_value()
+    attempt = (email, hashlib.sha256(password.encode("utf-8")).hexdigest())
+    with failed_logins_lock:
+        if attempt in failed_logins:
+            return jsonify({"message": "Invalid credentials"}), 400
+    try:
+        user = User.query.filter_by(email=email).first()
+        if not user or not user.check_password(password):
+            with failed_logins_lock:
+                failed_logins[attempt] = True
             return jsonify({"message": "Invalid credentials"}), 400
     except Exception as e:
         return jsonify({"message": "Invalid credentials"}), 400
@@ -0,0 +1,74 @@
+"""
+This module defines the request schemas used to validate API input.
+"""
+from typing import List, Optional
+
+from pydantic import (
+    BaseModel,
+    EmailStr,
+    Field,
+    RootModel,
+    SecretStr,
+    field_serializer,
+)
+
+
+class UserCreate(BaseModel):
+    """
+    Payload for creating (registering) a user.
+    """
+
+    username: str = Field(min_length=1, max_length=64)
+    email: EmailStr = Field(max_length=120)
+    password: SecretStr = Field(min_length=1)
+
+    @field_serializer("password")
+    def dump_password(self, password):
+        return password.get_secret_value()
+
+
+class UserUpdate(BaseModel):
+    """
+    Payload for updating a user; every field is optional.
+    """
+
+    username: Optional[str] = Field(None, min_length=1, max_length=64)
+    email: Optional[EmailStr] = Field(None, max_length=120)
+    password: Optional[SecretStr] = Field(None, min_length=1)
+
+    @field_serializer("password")
+    def dump_password(self, password):
+        return password.get_secret_value() if password else None
+
+
+class Login(BaseModel):
+    """
+    Credentials submitted to log in.
+    """
+
+    email: str = Field(min_length=1)
+    password: SecretStr = Field(min_length=1)
+
+
+class InboxIn(BaseModel):
+    """
+    Payload for creating or renaming an inbox.
+    """
+
+    name: str = Field(min_length=1, max_length=64)
+
+
+class MessageCreate(BaseModel):
+    """
+    Payload for posting a message to an inbox.
+    """
+
+    body: str = Field(min_length=1)
+
+
+class MessageBatch(RootModel[List[MessageCreate]]):
+    """
+    A list of messages posted to an inbox in one request.
+    """
+
+    root: List[MessageCreate] = Field(min_length=1, max_length=1000)
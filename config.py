@@ -9,3 +9,17 @@ class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY") or "you-will-never-guess"
     SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    BASE_URL = os.environ.get("BASE_URL")
+    INIT_DB = os.environ.get("FLASK_INIT_DB") == "1"
+    # bcrypt work factor; each step doubles hashing time. Lower it for local
+    # development and tests, keep at least 12 in production.
+    BCRYPT_LOG_ROUNDS = int(os.environ.get("BCRYPT_LOG_ROUNDS", 12))
+    # Size the QueuePool for the worker's concurrency; pre-ping and recycle
+    # so connections dropped by MySQL's wait_timeout are replaced quietly.
+    # (An asyncio engine would need AsyncAdaptedQueuePool instead.)
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", 25)),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", 25)),
+        "pool_pre_ping": True,
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", 1800)),
+    }
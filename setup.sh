@@ -62,6 +62,24 @@ echo "Installing project dependencies..."
 pip install --upgrade pip
 pip install -r requirements.txt
 
+# Create or migrate the database schema
+has_table() {
+	python -c "import sys; from sqlalchemy import create_engine, inspect; from config import Config; sys.exit(not inspect(create_engine(Config.SQLALCHEMY_DATABASE_URI)).has_table('$1'))"
+}
+if has_table alembic_version; then
+	echo "Migrating the database..."
+	alembic upgrade head
+elif has_table users; then
+	# Tables from before Alembic tracking: mark the baseline, then migrate
+	echo "Migrating the untracked database..."
+	alembic stamp 3d3bb0cee6c3
+	alembic upgrade head
+else
+	echo "Creating the database tables..."
+	FLASK_INIT_DB=1 python -c "from app import create_app; create_app()"
+	alembic stamp head
+fi
+
 # Script complete
 echo "Setup complete. Don't forget to source the virtual environment: source venv/bin/activate"
 